@@ -1,9 +1,22 @@
+"""Serpent Sprint, a small snake game built on pygame.
+
+The per-tick game logic is plain Python bookkeeping, which PyPy's JIT speeds up
+well. PyPy is the recommended runtime::
+
+    pypy3 -m pip install pygame-ce numpy
+    pypy3 test.py
+
+It still runs unchanged under CPython with ``python test.py``.
+"""
+
 import math
 import random
 import sys
-from dataclasses import dataclass
-from typing import List, Tuple
+import time
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
 
+import numpy as np
 import pygame
 
 # Constants for the game configuration
@@ -12,7 +25,11 @@ WINDOW_HEIGHT = 540
 GRID_SIZE = 24
 GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
 GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
-FPS = 12
+GRID_CELLS = GRID_WIDTH * GRID_HEIGHT
+FPS = 60
+TICK_RATE = 12
+TICK_INTERVAL = 1 / TICK_RATE
+TEXT_CACHE_SIZE = 64
 
 # Colors
 BG_TOP = (30, 30, 40)
@@ -27,7 +44,7 @@ BUTTON_BG = (64, 74, 92)
 BUTTON_HOVER = (102, 252, 241)
 OVERLAY_COLOR = (10, 10, 10, 160)
 
-# Directions represented as vectors
+# Directions represented as (dx, dy) grid steps
 DIRECTIONS = {
     pygame.K_UP: (0, -1),
     pygame.K_DOWN: (0, 1),
@@ -35,36 +52,57 @@ DIRECTIONS = {
     pygame.K_RIGHT: (1, 0),
 }
 
+# WASD aliases for the arrow keys
+WASD_TO_ARROW = {
+    pygame.K_w: pygame.K_UP,
+    pygame.K_s: pygame.K_DOWN,
+    pygame.K_a: pygame.K_LEFT,
+    pygame.K_d: pygame.K_RIGHT,
+}
+STEERING_KEYS = tuple(DIRECTIONS) + tuple(WASD_TO_ARROW)
+
 
-@dataclass
-class SnakeSegment:
-    x: int
-    y: int
+def make_surface(size: Tuple[int, int], alpha: bool = False) -> pygame.Surface:
+    """Create a surface already converted to the display's pixel format.
 
-    @property
-    def position(self) -> Tuple[int, int]:
-        return self.x, self.y
+    Requires ``pygame.display.set_mode`` to have been called.
+    """
+    if alpha:
+        return pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+    return pygame.Surface(size).convert()
 
 
 class Button:
     """Simple button with hover feedback for better UX."""
 
+    __slots__ = ("text", "font", "center", "padding", "rect", "label", "label_rect", "prepared_text")
+
     def __init__(self, text: str, font: pygame.font.Font, center: Tuple[int, int]):
         self.text = text
         self.font = font
         self.center = center
         self.padding = pygame.Vector2(28, 12)
         self.rect = pygame.Rect(0, 0, 0, 0)
-
-    def draw(self, surface: pygame.Surface, hovered: bool) -> None:
-        label = self.font.render(self.text, True, TEXT_COLOR)
-        self.rect = label.get_rect()
+        self.label: Optional[pygame.Surface] = None
+        self.label_rect = pygame.Rect(0, 0, 0, 0)
+        # Text the cached label was rendered from; re-render only when it changes.
+        self.prepared_text: Optional[str] = None
+
+    def prepare(self) -> None:
+        self.label = self.font.render(self.text, True, TEXT_COLOR).convert_alpha()
+        self.label_rect = self.label.get_rect(center=self.center)
+        self.rect = self.label.get_rect()
         self.rect.inflate_ip(self.padding.x, self.padding.y)
         self.rect.center = self.center
+        self.prepared_text = self.text
+
+    def draw(self, surface: pygame.Surface, hovered: bool) -> None:
+        if self.prepared_text != self.text:
+            self.prepare()
 
         bg_color = BUTTON_HOVER if hovered else BUTTON_BG
         pygame.draw.rect(surface, bg_color, self.rect, border_radius=16)
-        surface.blit(label, label.get_rect(center=self.center))
+        surface.blit(self.label, self.label_rect)
 
     def is_hovered(self, mouse_pos: Tuple[int, int]) -> bool:
         return self.rect.collidepoint(mouse_pos)
@@ -75,6 +113,7 @@ class SnakeGame:
         pygame.init()
         pygame.display.set_caption("Serpent Sprint")
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.screen.set_clip(pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
         self.clock = pygame.time.Clock()
         self.running = True
 
@@ -84,13 +123,35 @@ class SnakeGame:
         self.small_font = pygame.font.SysFont("Poppins", 20)
 
         self.state = "menu"
-        self.direction = pygame.Vector2(1, 0)
+        self.direction: Tuple[int, int] = (1, 0)
         self.pending_direction = self.direction
-        self.snake: List[SnakeSegment] = []
-        self.food = SnakeSegment(0, 0)
+        self.previous_keys = pygame.key.get_pressed()
+        # Snake cells live in fixed-size parallel coordinate arrays used as a ring buffer:
+        # segment ``i`` (0 is the head) sits at ``(snake_head + i) % GRID_CELLS``. A set of
+        # packed ``y * GRID_WIDTH + x`` cell indices gives quick occupancy tests, and the
+        # free cells are kept in a list (with each cell's list index) so food can be
+        # sampled directly and cells swap-removed in O(1).
+        self.xs = array("h", [0]) * GRID_CELLS
+        self.ys = array("h", [0]) * GRID_CELLS
+        self.snake_head = 0
+        self.snake_length = 0
+        self.occupied: Set[int] = set()
+        self.free_cells: List[int] = []
+        self.free_index: Dict[int, int] = {}
+        self.food = (0, 0)
         self.score = 0
         self.best_score = 0
 
+        self.bg_surface = self.build_background()
+        self.head_surf = self.build_stamp(GRID_SIZE - 4, SNAKE_HEAD_COLOR, GRID_SIZE // 3)
+        self.body_surf = self.build_stamp(GRID_SIZE - 4, SNAKE_BODY_COLOR, GRID_SIZE // 5)
+        self.food_surf = self.build_stamp(GRID_SIZE - 6, FOOD_COLOR, GRID_SIZE // 3)
+        self.overlay_surface = make_surface((WINDOW_WIDTH, WINDOW_HEIGHT), alpha=True)
+        self.overlay_surface.fill(OVERLAY_COLOR)
+        # Last gameplay frame, reused as the backdrop for the pause and game over screens.
+        self.paused_snapshot = self.bg_surface
+        self.text_cache: Dict[Tuple[str, int], Tuple[pygame.Surface, pygame.Surface]] = {}
+
         self.start_button = Button("Tap Space to Start", self.medium_font, (WINDOW_WIDTH // 2, WINDOW_HEIGHT - 120))
         self.reset()
 
@@ -100,52 +161,108 @@ class SnakeGame:
     def reset(self) -> None:
         center_x = GRID_WIDTH // 2
         center_y = GRID_HEIGHT // 2
-        self.snake = [
-            SnakeSegment(center_x, center_y),
-            SnakeSegment(center_x - 1, center_y),
-            SnakeSegment(center_x - 2, center_y),
-        ]
-        self.direction = pygame.Vector2(1, 0)
+        self.xs[0:3] = array("h", [center_x, center_x - 1, center_x - 2])
+        self.ys[0:3] = array("h", [center_y, center_y, center_y])
+        self.snake_head = 0
+        self.snake_length = 3
+        self.occupied = {y * GRID_WIDTH + x for x, y in zip(*self.snake_coords())}
+        self.free_cells = [cell for cell in range(GRID_CELLS) if cell not in self.occupied]
+        self.free_index = {cell: index for index, cell in enumerate(self.free_cells)}
+        self.direction = (1, 0)
         self.pending_direction = self.direction
         self.score = 0
         self.spawn_food()
 
+    def snake_coords(self) -> Tuple[array, array]:
+        """Return the snake's x and y coordinates in head-to-tail order."""
+        start = self.snake_head
+        end = start + self.snake_length
+        if end <= GRID_CELLS:
+            return self.xs[start:end], self.ys[start:end]
+        wrapped = end - GRID_CELLS
+        return self.xs[start:] + self.xs[:wrapped], self.ys[start:] + self.ys[:wrapped]
+
     def spawn_food(self) -> None:
-        positions = {segment.position for segment in self.snake}
-        while True:
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
-            if (x, y) not in positions:
-                self.food = SnakeSegment(x, y)
-                break
+        if not self.free_cells:
+            # The snake covers the whole board; there is nowhere left to go.
+            self.trigger_game_over()
+            return
+        cell = self.free_cells[random.randrange(len(self.free_cells))]
+        self.food = (cell % GRID_WIDTH, cell // GRID_WIDTH)
+
+    def occupy_cell(self, cell: int) -> None:
+        self.occupied.add(cell)
+        index = self.free_index.pop(cell)
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[index] = last
+            self.free_index[last] = index
+
+    def release_cell(self, cell: int) -> None:
+        self.occupied.discard(cell)
+        self.free_index[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
 
     # ------------------------------------------------------------------
-    # Drawing routines
+    # Cached surfaces
     # ------------------------------------------------------------------
-    def draw_gradient_background(self) -> None:
-        for y in range(WINDOW_HEIGHT):
-            ratio = y / WINDOW_HEIGHT
-            r = BG_TOP[0] * (1 - ratio) + BG_BOTTOM[0] * ratio
-            g = BG_TOP[1] * (1 - ratio) + BG_BOTTOM[1] * ratio
-            b = BG_TOP[2] * (1 - ratio) + BG_BOTTOM[2] * ratio
-            pygame.draw.line(self.screen, (int(r), int(g), int(b)), (0, y), (WINDOW_WIDTH, y))
-
-    def draw_grid(self) -> None:
+    def build_background(self) -> pygame.Surface:
+        # The gradient and grid never change, so render them once and blit every frame.
+        surface = make_surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        ratio = (np.arange(WINDOW_HEIGHT) / WINDOW_HEIGHT)[:, None]
+        rows = (np.array(BG_TOP) * (1 - ratio) + np.array(BG_BOTTOM) * ratio).astype(np.uint8)
+        # surfarray indexes pixels as [x, y], so repeat each row colour along x.
+        pixels = np.ascontiguousarray(np.broadcast_to(rows, (WINDOW_WIDTH, WINDOW_HEIGHT, 3)))
+        pygame.surfarray.blit_array(surface, pixels)
+
         for x in range(0, WINDOW_WIDTH, GRID_SIZE):
-            pygame.draw.line(self.screen, GRID_COLOR, (x, 0), (x, WINDOW_HEIGHT))
+            pygame.draw.line(surface, GRID_COLOR, (x, 0), (x, WINDOW_HEIGHT))
         for y in range(0, WINDOW_HEIGHT, GRID_SIZE):
-            pygame.draw.line(self.screen, GRID_COLOR, (0, y), (WINDOW_WIDTH, y))
+            pygame.draw.line(surface, GRID_COLOR, (0, y), (WINDOW_WIDTH, y))
+        return surface
+
+    def build_stamp(self, size: int, color: Tuple[int, int, int], radius: int) -> pygame.Surface:
+        surface = make_surface((size, size), alpha=True)
+        pygame.draw.rect(surface, color, surface.get_rect(), border_radius=radius)
+        return surface
+
+    def render_text(self, text: str, font: pygame.font.Font) -> Tuple[pygame.Surface, pygame.Surface]:
+        """Return the cached (label, shadow) surfaces for ``text``."""
+        key = (text, id(font))
+        surfaces = self.text_cache.get(key)
+        if surfaces is None:
+            if len(self.text_cache) >= TEXT_CACHE_SIZE:
+                # Evict the oldest entry so changing scores cannot grow the cache forever.
+                del self.text_cache[next(iter(self.text_cache))]
+            label = font.render(text, True, TEXT_COLOR).convert_alpha()
+            shadow = font.render(text, True, SHADOW_COLOR).convert_alpha()
+            surfaces = (label, shadow)
+            self.text_cache[key] = surfaces
+        return surfaces
+
+    # ------------------------------------------------------------------
+    # Drawing routines
+    # ------------------------------------------------------------------
+    def draw_background(self) -> None:
+        self.screen.blit(self.bg_surface, (0, 0))
 
     def draw_snake(self) -> None:
-        for index, segment in enumerate(self.snake):
-            rect = pygame.Rect(segment.x * GRID_SIZE, segment.y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-            color = SNAKE_HEAD_COLOR if index == 0 else SNAKE_BODY_COLOR
-            radius = GRID_SIZE // 3 if index == 0 else GRID_SIZE // 5
-            pygame.draw.rect(self.screen, color, rect.inflate(-4, -4), border_radius=radius)
+        # Only on-grid cells are handed to SDL; its clipping path for off-screen blits is slow.
+        xs, ys = self.snake_coords()
+        stamps = [
+            (self.body_surf, (x * GRID_SIZE + 2, y * GRID_SIZE + 2))
+            for x, y in zip(xs[1:], ys[1:])
+            if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT
+        ]
+        head_x, head_y = xs[0], ys[0]
+        if 0 <= head_x < GRID_WIDTH and 0 <= head_y < GRID_HEIGHT:
+            stamps.append((self.head_surf, (head_x * GRID_SIZE + 2, head_y * GRID_SIZE + 2)))
+        # blits() rather than pygame-ce's fblits() keeps the game portable to upstream pygame.
+        self.screen.blits(stamps, doreturn=False)
 
     def draw_food(self) -> None:
-        rect = pygame.Rect(self.food.x * GRID_SIZE, self.food.y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-        pygame.draw.rect(self.screen, FOOD_COLOR, rect.inflate(-6, -6), border_radius=GRID_SIZE // 3)
+        food_x, food_y = self.food
+        self.screen.blit(self.food_surf, (food_x * GRID_SIZE + 3, food_y * GRID_SIZE + 3))
 
     def draw_scoreboard(self) -> None:
         score_text = f"Score: {self.score}"
@@ -161,8 +278,7 @@ class SnakeGame:
         align_right: bool = False,
         center: bool = False,
     ) -> None:
-        label = font.render(text, True, TEXT_COLOR)
-        shadow = font.render(text, True, SHADOW_COLOR)
+        label, shadow = self.render_text(text, font)
 
         label_rect = label.get_rect()
         if center:
@@ -179,9 +295,7 @@ class SnakeGame:
         self.screen.blit(label, label_rect)
 
     def draw_overlay(self, text: str, subtitle: str) -> None:
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill(OVERLAY_COLOR)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.overlay_surface, (0, 0))
 
         self.draw_shadow_text(text, self.title_font, (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 60), center=True)
         self.draw_shadow_text(subtitle, self.medium_font, (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 10), center=True)
@@ -191,49 +305,71 @@ class SnakeGame:
     # Event handling and game logic
     # ------------------------------------------------------------------
     def handle_direction_change(self, key: int) -> None:
-        if key not in DIRECTIONS:
-            return
-        new_direction = pygame.Vector2(DIRECTIONS[key])
-        if new_direction + self.direction == pygame.Vector2():
+        new_direction = DIRECTIONS[key]
+        if new_direction[0] + self.direction[0] == 0 and new_direction[1] + self.direction[1] == 0:
             return
         self.pending_direction = new_direction
 
+    def poll_direction(self) -> None:
+        # Steering is sampled from the keyboard state rather than dispatched per key event.
+        # Only keys that went down since the last poll turn the snake; holding one does nothing.
+        keys = pygame.key.get_pressed()
+        previous = self.previous_keys
+        self.previous_keys = keys
+        for key in STEERING_KEYS:
+            if keys[key] and not previous[key]:
+                self.handle_direction_change(WASD_TO_ARROW.get(key, key))
+
     def update_snake(self) -> None:
         self.direction = self.pending_direction
-        new_head = SnakeSegment(
-            self.snake[0].x + int(self.direction.x),
-            self.snake[0].y + int(self.direction.y),
-        )
+        dx, dy = self.direction
+        head_x = self.xs[self.snake_head] + dx
+        head_y = self.ys[self.snake_head] + dy
 
         # Collision with boundaries
-        if not (0 <= new_head.x < GRID_WIDTH) or not (0 <= new_head.y < GRID_HEIGHT):
+        if not (0 <= head_x < GRID_WIDTH) or not (0 <= head_y < GRID_HEIGHT):
             self.trigger_game_over()
             return
 
         # Collision with itself
-        if any(segment.position == new_head.position for segment in self.snake):
+        head_cell = head_y * GRID_WIDTH + head_x
+        if head_cell in self.occupied:
             self.trigger_game_over()
             return
 
-        self.snake.insert(0, new_head)
+        # The slot before the head is unused because snake_length < GRID_CELLS here:
+        # a full board has already ended the run via spawn_food or the collision check.
+        self.snake_head = (self.snake_head - 1) % GRID_CELLS
+        self.xs[self.snake_head] = head_x
+        self.ys[self.snake_head] = head_y
+        self.snake_length += 1
+        self.occupy_cell(head_cell)
 
-        if new_head.position == self.food.position:
+        if (head_x, head_y) == self.food:
             self.score += 10
             self.spawn_food()
             self.best_score = max(self.best_score, self.score)
         else:
-            self.snake.pop()
+            self.snake_length -= 1
+            tail = (self.snake_head + self.snake_length) % GRID_CELLS
+            self.release_cell(self.ys[tail] * GRID_WIDTH + self.xs[tail])
+
+    def snapshot_gameplay(self) -> None:
+        self.draw_gameplay()
+        # Copies of the display surface already share its pixel format.
+        self.paused_snapshot = self.screen.copy()
 
     def trigger_game_over(self) -> None:
         self.state = "game_over"
+        # Update the best score before freezing the frame so the scoreboard is current.
         self.best_score = max(self.best_score, self.score)
+        self.snapshot_gameplay()
 
     # ------------------------------------------------------------------
     # Screens
     # ------------------------------------------------------------------
     def draw_menu(self) -> None:
-        self.draw_gradient_background()
-        self.draw_grid()
+        self.draw_background()
         self.draw_shadow_text("Serpent Sprint", self.title_font, (WINDOW_WIDTH // 2, 120), center=True)
         instructions = [
             "Use arrow keys or WASD to glide.",
@@ -248,18 +384,17 @@ class SnakeGame:
         self.start_button.draw(self.screen, hovered)
 
     def draw_gameplay(self) -> None:
-        self.draw_gradient_background()
-        self.draw_grid()
+        self.draw_background()
         self.draw_snake()
         self.draw_food()
         self.draw_scoreboard()
 
     def draw_pause(self) -> None:
-        self.draw_gameplay()
+        self.screen.blit(self.paused_snapshot, (0, 0))
         self.draw_overlay("Paused", "Take a breath, racer!")
 
     def draw_game_over(self) -> None:
-        self.draw_gameplay()
+        self.screen.blit(self.paused_snapshot, (0, 0))
         subtitle = f"Final score: {self.score}"
         self.draw_overlay("Game Over", subtitle)
 
@@ -267,6 +402,8 @@ class SnakeGame:
     # Main loop
     # ------------------------------------------------------------------
     def run(self) -> None:
+        # The snake advances at TICK_RATE while the screen and input refresh at FPS.
+        next_tick = time.perf_counter() + TICK_INTERVAL
         while self.running:
             self.clock.tick(FPS)
             for event in pygame.event.get():
@@ -278,8 +415,18 @@ class SnakeGame:
                     if self.start_button.is_hovered(event.pos):
                         self.state = "playing"
 
-            if self.state == "playing":
-                self.update_snake()
+            now = time.perf_counter()
+            if self.state != "playing":
+                next_tick = now + TICK_INTERVAL
+                self.previous_keys = pygame.key.get_pressed()
+            else:
+                self.poll_direction()
+                if now >= next_tick:
+                    self.update_snake()
+                    # Skip missed ticks after a stall instead of fast-forwarding through them.
+                    next_tick += TICK_INTERVAL
+                    if next_tick <= now:
+                        next_tick = now + TICK_INTERVAL
 
             if self.state == "menu":
                 self.draw_menu()
@@ -296,23 +443,13 @@ class SnakeGame:
         sys.exit()
 
     def handle_keydown(self, key: int) -> None:
-        if key in (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d):
-            key_mapping = {
-                pygame.K_w: pygame.K_UP,
-                pygame.K_s: pygame.K_DOWN,
-                pygame.K_a: pygame.K_LEFT,
-                pygame.K_d: pygame.K_RIGHT,
-            }
-            key = key_mapping[key]
-
         if self.state == "menu":
             if key in (pygame.K_SPACE, pygame.K_RETURN):
                 self.state = "playing"
         elif self.state == "playing":
             if key == pygame.K_SPACE:
                 self.state = "paused"
-            else:
-                self.handle_direction_change(key)
+                self.snapshot_gameplay()
         elif self.state == "paused":
             if key == pygame.K_SPACE:
                 self.state = "playing"